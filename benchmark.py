@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""Benchmark and regression suite for the Python tooling.
+
+Covers `convert_to_solidity` in reproduce.py and the Vm.sol generator in
+lib/forge-std/scripts/vm.py, using synthetic inputs in the formats they consume.
+
+    python benchmark.py                       # run and compare with the baseline
+    python benchmark.py --save-baseline       # run and overwrite the baseline
+    python benchmark.py --sizes 1K,1M,1G      # trace sizes (default: 1K,64K,1M,16M)
+    python benchmark.py gen-trace 1G trace.txt
+    python benchmark.py gen-spec 1000 cheatcodes.json
+
+Inputs are generated up front and written to temporary files. Every case then runs in
+its own process that only reads its input, so its peak RSS covers neither the generator
+nor earlier cases.
+
+Each case gets one untimed warm-up run, then at least MIN_REPEATS timed runs with a
+fresh collection before each and the cyclic GC disabled while timing. The gate compares
+the fastest run (best-of-N) and skips cases whose baseline is under MIN_GATED_LATENCY,
+since those are timer noise. Peak RSS is gated for every case.
+
+Timings are absolute, so the baseline only holds for the machine that recorded it. Run
+with --save-baseline on each machine (or CI runner type) before relying on the gate.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+VM_SCRIPTS = os.path.join(ROOT, "lib", "forge-std", "scripts")
+BASELINE_PATH = os.path.join(ROOT, "benchmark_baseline.json")
+
+DEFAULT_SIZES = "1K,64K,1M,16M"
+DEFAULT_SPEC_SIZES = "1000,10000"
+DEFAULT_THRESHOLD = 0.25
+
+MIN_TIME = 1.0
+WARMUP_REPEATS = 1
+MIN_REPEATS = 20
+MAX_REPEATS = 50
+MIN_GATED_LATENCY = 1e-3
+
+UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+HANDLERS = [
+    "pod_bond",
+    "pod_debond",
+    "pod_addLiquidityV2",
+    "pod_removeLiquidityV2",
+    "stakingPool_stake",
+    "stakingPool_unstake",
+    "aspTKN_deposit",
+    "aspTKN_mint",
+    "aspTKN_withdraw",
+    "aspTKN_redeem",
+    "lendingAssetVault_deposit",
+    "lendingAssetVault_withdraw",
+    "leverageManager_addLeverage",
+    "leverageManager_removeLeverage",
+    "collateralToMarketId",
+]
+
+CHEATCODE_GROUPS = [
+    "evm",
+    "testing",
+    "scripting",
+    "filesystem",
+    "environment",
+    "string",
+    "json",
+    "toml",
+    "cryptography",
+    "utilities",
+]
+
+WORDS = "the a of to sets gets returns value given address slot storage key".split()
+
+
+def parse_size(s: str) -> int:
+    s = s.strip().upper().removesuffix("B")
+    if s and s[-1] in UNITS:
+        return int(float(s[:-1]) * UNITS[s[-1]])
+    return int(s)
+
+
+def format_size(n: int) -> str:
+    for unit in ("G", "M", "K"):
+        if n >= UNITS[unit] and n % UNITS[unit] == 0:
+            return f"{n // UNITS[unit]}{unit}"
+    return str(n)
+
+
+# Synthetic workloads
+
+
+def _trace_line(r: random.Random) -> str:
+    if r.random() < 0.1:
+        line = "*wait*"
+    else:
+        args = ",".join(
+            str(r.getrandbits(r.choice([16, 32, 128, 256])))
+            for _ in range(r.randint(1, 4))
+        )
+        line = f"PeapodsInvariant.{r.choice(HANDLERS)}({args})"
+        if r.random() < 0.7:
+            line += f" from: 0x{r.getrandbits(160):040x}"
+        if r.random() < 0.2:
+            line += f" Gas: {r.randint(21000, 30_000_000)}"
+    if line == "*wait*" or r.random() < 0.5:
+        line += f" Time delay: {r.randint(1, 604800)} seconds"
+        line += f" Block delay: {r.randint(1, 60000)}"
+    return "    " + line + "\n"
+
+
+def iter_trace_chunks(size: int, seed: int = 0, pool_size: int = 4096):
+    """Yield chunks of a fuzzer call sequence totalling roughly `size` bytes.
+
+    Lines are drawn from a fixed pool so multi-gigabyte traces are cheap to produce.
+    """
+    r = random.Random(seed)
+    pool = [_trace_line(r) for _ in range(pool_size)]
+    written = 0
+    while written < size:
+        lines = []
+        chunk = 0
+        while chunk < (1 << 20) and written + chunk < size:
+            line = pool[r.randrange(pool_size)]
+            lines.append(line)
+            chunk += len(line)
+        written += chunk
+        yield "".join(lines)
+
+
+def generate_trace(size: int, seed: int = 0) -> str:
+    return "".join(iter_trace_chunks(size, seed))
+
+
+def write_trace(file_path: str, size: int, seed: int = 0):
+    with open(file_path, "w") as f:
+        for chunk in iter_trace_chunks(size, seed):
+            f.write(chunk)
+
+
+def _description(r: random.Random) -> str:
+    lines = [
+        " ".join(r.choice(WORDS) for _ in range(r.randint(4, 14)))
+        for _ in range(r.randint(0, 3))
+    ]
+    return "\n".join(lines)
+
+
+def generate_spec(n: int, seed: int = 0) -> dict:
+    """Build a synthetic `cheatcodes.json` document with `n` cheatcodes."""
+    r = random.Random(seed)
+
+    cheatcodes = []
+    for i in range(n):
+        name = f"cheat{i}"
+        types = [
+            r.choice(["uint256", "address", "bytes32", "string"])
+            for _ in range(r.randint(0, 3))
+        ]
+        params = ", ".join(
+            f"{ty}{' calldata' if ty == 'string' else ''} p{j}"
+            for j, ty in enumerate(types)
+        )
+        mutability = r.choice(["view", "pure", ""])
+        returns = r.choice(
+            ["", " returns (uint256 value)", " returns (bytes memory data)"]
+        )
+        attrs = f"external {mutability}".rstrip()
+        declaration = f"function {name}({params}) {attrs}{returns};"
+        selector = r.getrandbits(32)
+        cheatcodes.append(
+            {
+                "func": {
+                    "id": name,
+                    "description": _description(r),
+                    "declaration": declaration,
+                    "visibility": "external",
+                    "mutability": mutability,
+                    "signature": f"{name}({','.join(types)})",
+                    "selector": f"0x{selector:08x}",
+                    "selectorBytes": list(selector.to_bytes(4, "big")),
+                },
+                "group": r.choice(CHEATCODE_GROUPS),
+                "status": r.choice(
+                    ["stable", "stable", "stable", "experimental", "internal"]
+                ),
+                "safety": r.choice(["safe", "unsafe"]),
+            }
+        )
+
+    n_types = max(1, n // 50)
+    return {
+        "errors": [
+            {
+                "name": "CheatcodeError",
+                "description": _description(r),
+                "declaration": "error CheatcodeError(string message);",
+            }
+        ],
+        "events": [
+            {
+                "name": f"Event{i}",
+                "description": _description(r),
+                "declaration": f"event Event{i}(address indexed who, uint256 value);",
+            }
+            for i in range(n_types)
+        ],
+        "enums": [
+            {
+                "name": f"Enum{i}",
+                "description": _description(r),
+                "variants": [
+                    {"name": f"Variant{j}", "description": _description(r)}
+                    for j in range(r.randint(2, 8))
+                ],
+            }
+            for i in range(n_types)
+        ],
+        "structs": [
+            {
+                "name": f"Struct{i}",
+                "description": _description(r),
+                "fields": [
+                    {
+                        "name": f"field{j}",
+                        "ty": r.choice(["uint256", "address", "bytes"]),
+                        "description": _description(r),
+                    }
+                    for j in range(r.randint(1, 8))
+                ],
+            }
+            for i in range(n_types)
+        ],
+        "cheatcodes": cheatcodes,
+    }
+
+
+# Cases
+
+
+def _import_reproduce():
+    sys.path.insert(0, ROOT)
+    import reproduce
+
+    return reproduce
+
+
+def _import_vm():
+    sys.path.insert(0, VM_SCRIPTS)
+    import vm
+
+    return vm
+
+
+def _read_models(contract):
+    """Touch every model field `generate` reads, so deferred decoding is still timed."""
+    for cheatcode in contract.cheatcodes:
+        func = cheatcode.func
+        func.id, func.description, func.declaration
+        cheatcode.group, cheatcode.status, cheatcode.safety
+    for enum in contract.enums:
+        for variant in enum.variants:
+            variant.name, variant.description
+    for struct in contract.structs:
+        for field in struct.fields:
+            field.name, field.ty, field.description
+    for item in contract.errors + contract.events:
+        item.description, item.declaration
+    return contract
+
+
+def write_input(kind: str, size: int, file_path: str):
+    if kind == "trace":
+        write_trace(file_path, size)
+    else:
+        with open(file_path, "w") as f:
+            json.dump(generate_spec(size), f)
+
+
+def _case_setup(kind: str, input_path: str):
+    """Return `(fn, input_bytes)` for a case reading its input from `input_path`."""
+    with open(input_path, "r") as f:
+        data = f.read()
+
+    if kind == "trace":
+        reproduce = _import_reproduce()
+        return lambda: reproduce.convert_to_solidity(data), len(data)
+
+    vm = _import_vm()
+    spec = data
+
+    if kind == "vm-load":
+        return lambda: _read_models(vm.Cheatcodes.from_json(spec)), len(spec)
+    if kind == "vm-generate":
+        return lambda: vm.generate(vm.Cheatcodes.from_json(spec)), len(spec)
+    if kind == "vm-generate-cached":
+        cache = vm.RenderCache()
+        uncached = vm.generate(vm.Cheatcodes.from_json(spec))
+        cold = vm.generate(vm.Cheatcodes.from_json(spec), cache=cache)
+        warm = vm.generate(vm.Cheatcodes.from_json(spec), cache=cache)
+        assert cold == uncached, "cold render cache changed the generated Vm.sol"
+        assert warm == uncached, "warm render cache changed the generated Vm.sol"
+        return lambda: vm.generate(vm.Cheatcodes.from_json(spec), cache=cache), len(
+            spec
+        )
+
+    raise ValueError(f"unknown case kind {kind}")
+
+
+def _percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    i = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[i]
+
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run_case(kind: str, input_path: str) -> dict:
+    fn, input_bytes = _case_setup(kind, input_path)
+
+    for _ in range(WARMUP_REPEATS):
+        fn()
+
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < MAX_REPEATS and (
+        len(latencies) < MIN_REPEATS or time.perf_counter() - start < MIN_TIME
+    ):
+        gc.collect()
+        gc.disable()
+        try:
+            t = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - t)
+        finally:
+            gc.enable()
+    latencies.sort()
+
+    p50 = _percentile(latencies, 50)
+    return {
+        "input_bytes": input_bytes,
+        "repeats": len(latencies),
+        "throughput_mb_s": input_bytes / p50 / 1e6,
+        "latency_s": {
+            "min": latencies[0],
+            "p50": p50,
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+        },
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def run_case_isolated(kind: str, input_path: str) -> dict:
+    res = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "_case", kind, input_path],
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    return json.loads(res.stdout)
+
+
+# Regression check
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        # Gate on the fastest run: the minimum is far less sensitive to scheduler and
+        # allocator noise than p50. Throughput and percentiles are only reported.
+        base_min, cur_min = base["latency_s"].get("min"), cur["latency_s"]["min"]
+        if base_min is None:
+            pass  # recorded before best-of-N timing; re-record with --save-baseline
+        elif base_min >= MIN_GATED_LATENCY and cur_min > base_min * (1 + threshold):
+            regressions.append(
+                f"{name}: min latency {base_min * 1e3:.2f} -> {cur_min * 1e3:.2f} ms"
+            )
+        if base["peak_rss_bytes"] and cur["peak_rss_bytes"]:
+            if cur["peak_rss_bytes"] > base["peak_rss_bytes"] * (1 + threshold):
+                regressions.append(
+                    f"{name}: peak RSS {base['peak_rss_bytes'] >> 20} -> {cur['peak_rss_bytes'] >> 20} MiB"
+                )
+    return regressions
+
+
+def print_results(results: dict):
+    print(
+        f"{'case':<28} {'MB/s':>10} {'min ms':>10} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'RSS MiB':>8} {'runs':>5}"
+    )
+    for name, r in results.items():
+        rss = r["peak_rss_bytes"] >> 20 if r["peak_rss_bytes"] else "-"
+        lat = r["latency_s"]
+        print(
+            f"{name:<28} {r['throughput_mb_s']:>10.2f} {lat['min'] * 1e3:>10.2f} "
+            f"{lat['p50'] * 1e3:>10.2f} {lat['p90'] * 1e3:>10.2f} "
+            f"{lat['p99'] * 1e3:>10.2f} {rss:>8} {r['repeats']:>5}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Python tooling against a recorded baseline"
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    gen_trace = sub.add_parser(
+        "gen-trace", help="write a synthetic fuzzer call sequence"
+    )
+    gen_trace.add_argument("size", help="approximate size, e.g. 1K, 16M, 1G")
+    gen_trace.add_argument("out")
+    gen_trace.add_argument("--seed", type=int, default=0)
+
+    gen_spec = sub.add_parser("gen-spec", help="write a synthetic cheatcodes.json")
+    gen_spec.add_argument("n", type=int, help="number of cheatcodes")
+    gen_spec.add_argument("out")
+    gen_spec.add_argument("--seed", type=int, default=0)
+
+    case = sub.add_parser("_case", help=argparse.SUPPRESS)
+    case.add_argument("kind")
+    case.add_argument("input_path")
+
+    parser.add_argument(
+        "--sizes", default=DEFAULT_SIZES, help=f"trace sizes (default: {DEFAULT_SIZES})"
+    )
+    parser.add_argument(
+        "--spec-sizes",
+        default=DEFAULT_SPEC_SIZES,
+        help=f"cheatcode counts for vm.py (default: {DEFAULT_SPEC_SIZES})",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="overwrite the baseline with this run",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"allowed relative slowdown or RSS growth (default: {DEFAULT_THRESHOLD})",
+    )
+    args = parser.parse_args()
+
+    if args.command == "gen-trace":
+        write_trace(args.out, parse_size(args.size), args.seed)
+        return
+    if args.command == "gen-spec":
+        with open(args.out, "w") as f:
+            json.dump(generate_spec(args.n, args.seed), f, indent=2)
+        return
+    if args.command == "_case":
+        json.dump(run_case(args.kind, args.input_path), sys.stdout)
+        return
+
+    cases = [("trace", parse_size(s)) for s in args.sizes.split(",")]
+    for n in args.spec_sizes.split(","):
+        cases += [
+            (kind, int(n)) for kind in ("vm-load", "vm-generate", "vm-generate-cached")
+        ]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind, size in cases:
+            name = f"{kind}:{format_size(size) if kind == 'trace' else size}"
+            input_path = os.path.join(
+                tmp, f"trace-{size}.txt" if kind == "trace" else f"spec-{size}.json"
+            )
+            if not os.path.exists(input_path):
+                write_input(kind, size, input_path)
+            print(f"running {name}", file=sys.stderr)
+            results[name] = run_case_isolated(kind, input_path)
+
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Wrote baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, results, args.threshold)
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"  {r}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
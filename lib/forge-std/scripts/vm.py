@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 
+import argparse
 import copy
+import hashlib
 import json
+import os
 import re
 import subprocess
 from enum import Enum as PyEnum
@@ -12,6 +15,7 @@ VoidFn = Callable[[], None]
 
 CHEATCODES_JSON_URL = "https://raw.githubusercontent.com/foundry-rs/foundry/master/crates/cheatcodes/assets/cheatcodes.json"
 OUT_PATH = "src/Vm.sol"
+RENDER_CACHE_PATH = "cache/vm-render.json"
 
 VM_SAFE_DOC = """\
 /// The `VmSafe` interface does not allow manipulation of the EVM state or other actions that may
@@ -26,9 +30,46 @@ VM_DOC = """\
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Generate Vm.sol from the upstream cheatcodes.json"
+    )
+    parser.add_argument(
+        "--no-docs",
+        action="store_true",
+        help="omit doc comments for a compact Vm.sol",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"re-render every item instead of reusing {RENDER_CACHE_PATH}",
+    )
+    args = parser.parse_args()
+    docs = not args.no_docs
+
     json_str = request.urlopen(CHEATCODES_JSON_URL).read().decode("utf-8")
-    contract = Cheatcodes.from_json(json_str)
+    contract = Cheatcodes.from_json(json_str, docs=docs)
+
+    cache = None if args.no_cache else RenderCache.load(RENDER_CACHE_PATH)
+
+    out = generate(contract, docs, cache)
+
+    with open(OUT_PATH, "w") as f:
+        f.write(out)
+
+    if cache is not None:
+        cache.save(RENDER_CACHE_PATH)
+
+    forge_fmt = ["forge", "fmt", OUT_PATH]
+    res = subprocess.run(forge_fmt)
+    assert res.returncode == 0, f"command failed: {forge_fmt}"
+
+    print(f"Wrote to {OUT_PATH}")
+
 
+def generate(
+    contract: "Cheatcodes", docs: bool = True, cache: "RenderCache | None" = None
+) -> str:
+    """Render the unformatted contents of `Vm.sol` for `contract`."""
     ccs = contract.cheatcodes
     ccs = list(filter(lambda cc: cc.status not in ["experimental", "internal"], ccs))
     ccs.sort(key=lambda cc: cc.func.id)
@@ -50,13 +91,15 @@ def main():
         spdx_identifier="MIT OR Apache-2.0",
         solidity_requirement=">=0.6.2 <0.9.0",
         abicoder_pragma=True,
+        cache=cache,
     )
     pp.p_prelude()
     pp.prelude = False
     out += pp.finish()
 
     out += "\n\n"
-    out += VM_SAFE_DOC
+    if docs:
+        out += VM_SAFE_DOC
     vm_safe = Cheatcodes(
         # TODO: Custom errors were introduced in 0.8.4
         errors=[],  # contract.errors
@@ -69,7 +112,8 @@ def main():
     out += pp.finish()
 
     out += "\n\n"
-    out += VM_DOC
+    if docs:
+        out += VM_DOC
     vm_unsafe = Cheatcodes(
         errors=[],
         events=[],
@@ -84,16 +128,7 @@ def main():
     def memory_to_calldata(m: re.Match) -> str:
         return " calldata " + m.group(1)
 
-    out = re.sub(r" memory (.*returns)", memory_to_calldata, out)
-
-    with open(OUT_PATH, "w") as f:
-        f.write(out)
-
-    forge_fmt = ["forge", "fmt", OUT_PATH]
-    res = subprocess.run(forge_fmt)
-    assert res.returncode == 0, f"command failed: {forge_fmt}"
-
-    print(f"Wrote to {OUT_PATH}")
+    return re.sub(r" memory (.*returns)", memory_to_calldata, out)
 
 
 class CmpCheatcode:
@@ -168,6 +203,17 @@ class Mutability(PyEnum):
 
 
 class Function:
+    __slots__ = (
+        "id",
+        "description",
+        "declaration",
+        "visibility",
+        "mutability",
+        "signature",
+        "selector",
+        "selector_bytes",
+    )
+
     id: str
     description: str
     declaration: str
@@ -198,10 +244,10 @@ class Function:
         self.selector_bytes = selector_bytes
 
     @staticmethod
-    def from_dict(d: dict) -> "Function":
+    def from_dict(d: dict, docs: bool = True) -> "Function":
         return Function(
             d["id"],
-            d["description"],
+            d["description"] if docs else "",
             d["declaration"],
             Visibility(d["visibility"]),
             Mutability(d["mutability"]),
@@ -212,6 +258,8 @@ class Function:
 
 
 class Cheatcode:
+    __slots__ = ("func", "group", "status", "safety")
+
     func: Function
     group: str
     status: str
@@ -224,9 +272,9 @@ class Cheatcode:
         self.safety = safety
 
     @staticmethod
-    def from_dict(d: dict) -> "Cheatcode":
+    def from_dict(d: dict, docs: bool = True) -> "Cheatcode":
         return Cheatcode(
-            Function.from_dict(d["func"]),
+            Function.from_dict(d["func"], docs),
             str(d["group"]),
             str(d["status"]),
             str(d["safety"]),
@@ -234,6 +282,8 @@ class Cheatcode:
 
 
 class Error:
+    __slots__ = ("name", "description", "declaration")
+
     name: str
     description: str
     declaration: str
@@ -244,11 +294,13 @@ class Error:
         self.declaration = declaration
 
     @staticmethod
-    def from_dict(d: dict) -> "Error":
-        return Error(**d)
+    def from_dict(d: dict, docs: bool = True) -> "Error":
+        return Error(d["name"], d["description"] if docs else "", d["declaration"])
 
 
 class Event:
+    __slots__ = ("name", "description", "declaration")
+
     name: str
     description: str
     declaration: str
@@ -259,11 +311,13 @@ class Event:
         self.declaration = declaration
 
     @staticmethod
-    def from_dict(d: dict) -> "Event":
-        return Event(**d)
+    def from_dict(d: dict, docs: bool = True) -> "Event":
+        return Event(d["name"], d["description"] if docs else "", d["declaration"])
 
 
 class EnumVariant:
+    __slots__ = ("name", "description")
+
     name: str
     description: str
 
@@ -271,8 +325,14 @@ class EnumVariant:
         self.name = name
         self.description = description
 
+    @staticmethod
+    def from_dict(d: dict, docs: bool = True) -> "EnumVariant":
+        return EnumVariant(d["name"], d["description"] if docs else "")
+
 
 class Enum:
+    __slots__ = ("name", "description", "variants")
+
     name: str
     description: str
     variants: list[EnumVariant]
@@ -283,15 +343,17 @@ class Enum:
         self.variants = variants
 
     @staticmethod
-    def from_dict(d: dict) -> "Enum":
+    def from_dict(d: dict, docs: bool = True) -> "Enum":
         return Enum(
             d["name"],
-            d["description"],
-            list(map(lambda v: EnumVariant(**v), d["variants"])),
+            d["description"] if docs else "",
+            [EnumVariant.from_dict(v, docs) for v in d["variants"]],
         )
 
 
 class StructField:
+    __slots__ = ("name", "ty", "description")
+
     name: str
     ty: str
     description: str
@@ -301,8 +363,14 @@ class StructField:
         self.ty = ty
         self.description = description
 
+    @staticmethod
+    def from_dict(d: dict, docs: bool = True) -> "StructField":
+        return StructField(d["name"], d["ty"], d["description"] if docs else "")
+
 
 class Struct:
+    __slots__ = ("name", "description", "fields")
+
     name: str
     description: str
     fields: list[StructField]
@@ -313,15 +381,17 @@ class Struct:
         self.fields = fields
 
     @staticmethod
-    def from_dict(d: dict) -> "Struct":
+    def from_dict(d: dict, docs: bool = True) -> "Struct":
         return Struct(
             d["name"],
-            d["description"],
-            list(map(lambda f: StructField(**f), d["fields"])),
+            d["description"] if docs else "",
+            [StructField.from_dict(f, docs) for f in d["fields"]],
         )
 
 
 class Cheatcodes:
+    __slots__ = ("errors", "events", "enums", "structs", "cheatcodes")
+
     errors: list[Error]
     events: list[Event]
     enums: list[Enum]
@@ -343,23 +413,23 @@ class Cheatcodes:
         self.cheatcodes = cheatcodes
 
     @staticmethod
-    def from_dict(d: dict) -> "Cheatcodes":
+    def from_dict(d: dict, docs: bool = True) -> "Cheatcodes":
         return Cheatcodes(
-            errors=[Error.from_dict(e) for e in d["errors"]],
-            events=[Event.from_dict(e) for e in d["events"]],
-            enums=[Enum.from_dict(e) for e in d["enums"]],
-            structs=[Struct.from_dict(e) for e in d["structs"]],
-            cheatcodes=[Cheatcode.from_dict(e) for e in d["cheatcodes"]],
+            errors=[Error.from_dict(e, docs) for e in d["errors"]],
+            events=[Event.from_dict(e, docs) for e in d["events"]],
+            enums=[Enum.from_dict(e, docs) for e in d["enums"]],
+            structs=[Struct.from_dict(e, docs) for e in d["structs"]],
+            cheatcodes=[Cheatcode.from_dict(e, docs) for e in d["cheatcodes"]],
         )
 
     @staticmethod
-    def from_json(s) -> "Cheatcodes":
-        return Cheatcodes.from_dict(json.loads(s))
+    def from_json(s, docs: bool = True) -> "Cheatcodes":
+        return Cheatcodes.from_dict(json.loads(s), docs)
 
     @staticmethod
-    def from_json_file(file_path: str) -> "Cheatcodes":
+    def from_json_file(file_path: str, docs: bool = True) -> "Cheatcodes":
         with open(file_path, "r") as f:
-            return Cheatcodes.from_dict(json.load(f))
+            return Cheatcodes.from_dict(json.load(f), docs)
 
 
 class Item(PyEnum):
@@ -395,6 +465,60 @@ class ItemOrder:
         )
 
 
+class RenderCache:
+    """Rendered item text keyed by a hash of the item and the printer settings it depends on.
+
+    Only entries looked up during the current run are written back by `save`, so items that
+    disappear upstream are dropped from the file.
+    """
+
+    # Bump whenever the printer output changes for the same input.
+    VERSION = 1
+
+    _entries: dict[str, str]
+    _used: dict[str, str]
+
+    def __init__(self, entries: dict[str, str] | None = None):
+        self._entries = entries if entries is not None else {}
+        self._used = {}
+
+    @staticmethod
+    def key(*parts) -> str:
+        data = json.dumps([RenderCache.VERSION, *parts], separators=(",", ":"))
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        text = self._entries.get(key)
+        if text is not None:
+            self._used[key] = text
+        return text
+
+    def put(self, key: str, text: str):
+        self._entries[key] = text
+        self._used[key] = text
+
+    @staticmethod
+    def load(file_path: str) -> "RenderCache":
+        try:
+            with open(file_path, "r") as f:
+                d = json.load(f)
+        except (OSError, ValueError):
+            return RenderCache()
+        if not isinstance(d, dict) or d.get("version") != RenderCache.VERSION:
+            return RenderCache()
+        entries = d.get("entries")
+        if not isinstance(entries, dict) or not all(
+            isinstance(k, str) and isinstance(v, str) for k, v in entries.items()
+        ):
+            return RenderCache()
+        return RenderCache(entries)
+
+    def save(self, file_path: str):
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        with open(file_path, "w") as f:
+            json.dump({"version": RenderCache.VERSION, "entries": self._used}, f)
+
+
 class CheatcodesPrinter:
     buffer: str
 
@@ -412,6 +536,8 @@ class CheatcodesPrinter:
 
     items_order: ItemOrder
 
+    cache: RenderCache | None
+
     def __init__(
         self,
         buffer: str = "",
@@ -424,6 +550,7 @@ class CheatcodesPrinter:
         indent_with: int | str = 4,
         nl_str: str = "\n",
         items_order: ItemOrder = ItemOrder.default(),
+        cache: RenderCache | None = None,
     ):
         self.prelude = prelude
         self.spdx_identifier = spdx_identifier
@@ -443,6 +570,7 @@ class CheatcodesPrinter:
             assert False, "indent_with must be int or str"
 
         self.items_order = items_order
+        self.cache = cache
 
     def finish(self) -> str:
         ret = self.buffer.rstrip()
@@ -504,7 +632,10 @@ class CheatcodesPrinter:
 
     def p_errors(self, errors: list[Error]):
         for error in errors:
-            self._p_line(lambda: self.p_error(error))
+            self._p_cached(
+                lambda: (Item.ERROR.value, error.declaration, error.description),
+                lambda: self._p_line(lambda: self.p_error(error)),
+            )
 
     def p_error(self, error: Error):
         self._p_comment(error.description, doc=True)
@@ -512,7 +643,10 @@ class CheatcodesPrinter:
 
     def p_events(self, events: list[Event]):
         for event in events:
-            self._p_line(lambda: self.p_event(event))
+            self._p_cached(
+                lambda: (Item.EVENT.value, event.declaration, event.description),
+                lambda: self._p_line(lambda: self.p_event(event)),
+            )
 
     def p_event(self, event: Event):
         self._p_comment(event.description, doc=True)
@@ -520,7 +654,15 @@ class CheatcodesPrinter:
 
     def p_enums(self, enums: list[Enum]):
         for enum in enums:
-            self._p_line(lambda: self.p_enum(enum))
+            self._p_cached(
+                lambda: (
+                    Item.ENUM.value,
+                    enum.name,
+                    enum.description,
+                    [(v.name, v.description) for v in enum.variants],
+                ),
+                lambda: self._p_line(lambda: self.p_enum(enum)),
+            )
 
     def p_enum(self, enum: Enum):
         self._p_comment(enum.description, doc=True)
@@ -541,7 +683,15 @@ class CheatcodesPrinter:
 
     def p_structs(self, structs: list[Struct]):
         for struct in structs:
-            self._p_line(lambda: self.p_struct(struct))
+            self._p_cached(
+                lambda: (
+                    Item.STRUCT.value,
+                    struct.name,
+                    struct.description,
+                    [(f.name, f.ty, f.description) for f in struct.fields],
+                ),
+                lambda: self._p_line(lambda: self.p_struct(struct)),
+            )
 
     def p_struct(self, struct: Struct):
         self._p_comment(struct.description, doc=True)
@@ -559,7 +709,11 @@ class CheatcodesPrinter:
 
     def p_functions(self, cheatcodes: list[Cheatcode]):
         for cheatcode in cheatcodes:
-            self._p_line(lambda: self.p_function(cheatcode.func))
+            func = cheatcode.func
+            self._p_cached(
+                lambda: (Item.FUNCTION.value, func.declaration, func.description),
+                lambda: self._p_line(lambda: self.p_function(func)),
+            )
 
     def p_function(self, func: Function):
         self._p_comment(func.description, doc=True)
@@ -600,6 +754,28 @@ class CheatcodesPrinter:
                 self._p_str(line)
                 self._p_nl()
 
+    def _p_cached(self, item: Callable[[], tuple], f: VoidFn):
+        # `item` is only called on cache lookups, so uncached printing pays nothing.
+        if self.cache is None:
+            f()
+            return
+
+        key = RenderCache.key(
+            item(),
+            self.indent_level,
+            self._indent_str,
+            self.nl_str,
+            self.block_doc_style,
+        )
+        text = self.cache.get(key)
+        if text is not None:
+            self._p_str(text)
+            return
+
+        start = len(self.buffer)
+        f()
+        self.cache.put(key, self.buffer[start:])
+
     def _with_indent(self, f: VoidFn):
         self._inc_indent()
         f()
@@ -59,8 +59,9 @@ def convert_to_solidity(call_sequence):
     return solidity_code
 
 
-# Example usage
-call_sequence = """
+if __name__ == "__main__":
+    # Example usage
+    call_sequence = """
 PeapodsInvariant.pod_bond(2455,89063,2197,7359728031390065322374290399224949003757973631999763537425004526956656055445)
     PeapodsInvariant.pod_addLiquidityV2(11344,71499,32415571041978010960063235659160843094754525720062629458088219924499405610455,263551192347352786203763059376465822233999771205583638808680051835362958)
     PeapodsInvariant.stakingPool_stake(253063106226358333514199647342591507453153798266168220375913146771918814355,3239316176860876682422915113487822058500344893575650191064987713544339811,16083031068229554073894008156206024808099244186921884360202709001559479)
@@ -68,5 +69,5 @@ PeapodsInvariant.pod_bond(2455,89063,2197,73597280313900653223742903992249490037
     *wait* Time delay: 21 seconds Block delay: 1
     PeapodsInvariant.aspTKN_withdraw(492918021694239959849823204962395933559318301830995537395292228510180577503,2932,1648371,706)
         """
-solidity_code = convert_to_solidity(call_sequence)
-print(solidity_code)
\ No newline at end of file
+    solidity_code = convert_to_solidity(call_sequence)
+    print(solidity_code)